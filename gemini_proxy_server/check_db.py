@@ -1,14 +1,23 @@
 import sqlite3
-conn = sqlite3.connect('metrics.db')
-cursor = conn.cursor()
+from contextlib import closing
 
-# Check request_logs
-cursor.execute("SELECT * FROM request_logs LIMIT 5")
-print("Request logs:", cursor.fetchall())
+# closing() guarantees the connection is released; sqlite3's own context
+# manager only ends the transaction
+with closing(sqlite3.connect('metrics.db')) as conn:
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA cache_size=-4096")
+    conn.execute("PRAGMA temp_store=MEMORY")
+    conn.execute("PRAGMA mmap_size=16777216")
+    conn.execute("PRAGMA query_only=ON")
+    conn.row_factory = sqlite3.Row
 
-# Check response_logs  
-cursor.execute("SELECT * FROM response_logs LIMIT 5")
-print("Response logs:", cursor.fetchall())
+    cursor = conn.cursor()
+    cursor.arraysize = 5
 
-# Exit when done
-exit()
\ No newline at end of file
+    # Check request_logs and response_logs, one row per line
+    for label, table in (("Request logs", "request_logs"), ("Response logs", "response_logs")):
+        cursor.execute(f"SELECT * FROM {table} LIMIT 5")
+        print(f"{label}:")
+        for row in cursor.fetchmany():
+            print(dict(row))
@@ -14,6 +14,16 @@ db_path = Config.DATABASE_URL.replace('sqlite:///', '')
 full_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), db_path)
 logger.info(f"SQLite database path: {full_path}")
 
+# Connection tuning applied to every new SQLite connection (cache and mmap
+# sized for a small metrics database: 4 MiB page cache, 16 MiB mmap)
+SQLITE_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA cache_size=-4096",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA mmap_size=16777216",
+)
+
 # Check database directly first
 try:
     # Try to connect directly with sqlite3 to verify the database file
@@ -41,6 +51,11 @@ try:
     # Add event listener for connection issues
     @event.listens_for(engine, "connect")
     def on_connect(dbapi_con, con_record):
+        # WAL + synchronous=NORMAL avoids an fsync per commit on the logging path
+        cursor = dbapi_con.cursor()
+        for pragma in SQLITE_PRAGMAS:
+            cursor.execute(pragma)
+        cursor.close()
         logger.info("Successfully connected to database")
         
     @event.listens_for(engine, "checkout")
@@ -8,6 +8,27 @@ from models import Base, RequestLog, ResponseLog
 
 logger = logging.getLogger(__name__)
 
+# External-content FTS5 table over request_logs.request_body, with the
+# triggers SQLite needs to keep it in sync, and a rebuild for existing rows.
+# It matches whole tokens and prefixes (unicode61), not arbitrary substrings.
+REQUEST_LOGS_FTS_SQL = """
+CREATE VIRTUAL TABLE IF NOT EXISTS request_logs_fts
+    USING fts5(request_body, content='request_logs', content_rowid='id');
+CREATE TRIGGER IF NOT EXISTS request_logs_fts_ai AFTER INSERT ON request_logs BEGIN
+    INSERT INTO request_logs_fts(rowid, request_body) VALUES (new.id, new.request_body);
+END;
+CREATE TRIGGER IF NOT EXISTS request_logs_fts_ad AFTER DELETE ON request_logs BEGIN
+    INSERT INTO request_logs_fts(request_logs_fts, rowid, request_body)
+        VALUES ('delete', old.id, old.request_body);
+END;
+CREATE TRIGGER IF NOT EXISTS request_logs_fts_au AFTER UPDATE ON request_logs BEGIN
+    INSERT INTO request_logs_fts(request_logs_fts, rowid, request_body)
+        VALUES ('delete', old.id, old.request_body);
+    INSERT INTO request_logs_fts(rowid, request_body) VALUES (new.id, new.request_body);
+END;
+INSERT INTO request_logs_fts(request_logs_fts) VALUES ('rebuild');
+"""
+
 def init_db():
     """Initialize the database and create tables if they don't exist."""
     try:
@@ -43,6 +64,34 @@ def init_db():
                     logger.info("Added missing model_used column to response_logs table.")
                 except Exception as e:
                     logger.error(f"Failed to add model_used column: {str(e)}")
+            
+            # Make sure response lookups by request_id use an index (through
+            # the engine, so it lands in the database the app actually uses)
+            try:
+                with engine.begin() as conn:
+                    conn.execute(text(
+                        "CREATE INDEX IF NOT EXISTS ix_response_logs_request_id "
+                        "ON response_logs (request_id);"
+                    ))
+            except Exception as e:
+                logger.error(f"Failed to create request_id index: {str(e)}")
+        
+        # Full-text index over request bodies, kept in sync by triggers.
+        # Uses a raw engine connection (executescript is sqlite3-only) so the
+        # table and triggers land in the database the app writes to.
+        try:
+            raw = engine.raw_connection()
+            try:
+                has_fts = raw.execute(
+                    "SELECT 1 FROM sqlite_master WHERE type='table' AND name='request_logs_fts';"
+                ).fetchone()
+                if not has_fts:
+                    raw.executescript(REQUEST_LOGS_FTS_SQL)
+                    logger.info("Created request_logs_fts full-text index.")
+            finally:
+                raw.close()
+        except Exception as e:
+            logger.error(f"Failed to create request_logs_fts index: {str(e)}")
                     
     except Exception as e:
         logger.error(f"Error initializing database: {str(e)}")
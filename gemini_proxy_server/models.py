@@ -21,7 +21,7 @@ class ResponseLog(Base):
     __tablename__ = 'response_logs'
     
     id = Column(Integer, primary_key=True, index=True)
-    request_id = Column(Integer, ForeignKey('request_logs.id'))
+    request_id = Column(Integer, ForeignKey('request_logs.id'), index=True)
     timestamp = Column(DateTime, default=datetime.utcnow)
     response_time_ms = Column(Float)
     response = Column(Text)
@@ -1,43 +1,86 @@
 import unittest
-import json
+import functools
+import io
 import time
 import os
 import sys
+import socket
+import threading
+import importlib.util
 from unittest.mock import patch
 import requests
-import threading
+from requests.adapters import HTTPAdapter
 import google.generativeai as genai
+import msgspec
+from sqlalchemy import bindparam, delete, insert, select, text
+from sqlalchemy.orm import scoped_session
+from waitress import create_server
 
 # Add the current directory to the path to import our modules
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 from config import Config
-from database import get_db, engine
+from database import SessionLocal, engine
 from models import RequestLog, ResponseLog
 from app import app
 
-class TestGeminiProxyServer(unittest.TestCase):
-    """Comprehensive unit tests for Gemini Proxy Server"""
+# Test progress output is collected here and written once per test class
+_buf = io.StringIO()
+_print = functools.partial(print, file=_buf)
+
+def _flush_output():
+    """Write buffered test output to stdout in a single call"""
+    sys.stdout.write(_buf.getvalue())
+    sys.stdout.flush()
+    _buf.seek(0)
+    _buf.truncate()
+
+def _wait_ready(host, port, timeout=5.0):
+    """Block until a TCP listener accepts connections on host:port"""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with socket.create_connection((host, port), timeout=0.5):
+                return
+        except OSError:
+            time.sleep(0.02)
+    raise TimeoutError(f"Server at {host}:{port} not ready after {timeout}s")
+
+class GenerateMetrics(msgspec.Struct):
+    """Expected shape of the 'metrics' field of /gemini/generate"""
+    prompt_tokens: int
+    completion_tokens: int
+    total_tokens: int
+
+class GenerateResponse(msgspec.Struct):
+    """Expected shape of a /gemini/generate response"""
+    text: str
+    metrics: GenerateMetrics
+    model: str
+
+# Statements built once and reused for the latest-row lookups
+LATEST_REQ = select(RequestLog).order_by(RequestLog.id.desc()).limit(1)
+RESP_BY_REQ = select(ResponseLog).where(ResponseLog.request_id == bindparam("rid")).limit(1)
+BODY_CONTAINS = text("SELECT 1 FROM request_logs WHERE id = :i AND instr(request_body, :p) > 0")
+FTS_MATCH = text("SELECT rowid FROM request_logs_fts WHERE request_logs_fts MATCH :q AND rowid = :i")
+
+class TestUnit(unittest.TestCase):
+    """Fast tests for configuration and database (no server or network)"""
     
     @classmethod
     def setUpClass(cls):
-        """Set up test environment"""
-        cls.app = app
-        cls.app.config['TESTING'] = True
-        cls.client = cls.app.test_client()
-        cls.server_url = 'http://localhost:5000'
-        
-        # Start the Flask app in a separate thread for integration tests
-        cls.server_thread = threading.Thread(
-            target=lambda: cls.app.run(host='0.0.0.0', port=5000, debug=False, use_reloader=False)
-        )
-        cls.server_thread.daemon = True
-        cls.server_thread.start()
-        time.sleep(2)  # Give server time to start
+        """Set up a session shared by all tests in the class"""
+        cls.Session = scoped_session(SessionLocal)
+    
+    @classmethod
+    def tearDownClass(cls):
+        """Clean up test environment"""
+        cls.Session.remove()
+        _flush_output()
     
     def test_1_api_key_setup(self):
         """Test 1: API Key Setup Test - Verify API key is configured"""
-        print("\n=== Test 1: API Key Setup ===")
+        _print("\n=== Test 1: API Key Setup ===")
         
         # Test that API key is loaded from environment
         self.assertIsNotNone(Config.GEMINI_API_KEY, "GEMINI_API_KEY should be set in environment")
@@ -52,27 +95,127 @@ class TestGeminiProxyServer(unittest.TestCase):
         self.assertIsNotNone(Config.MODEL_NAME, "MODEL_NAME should be set")
         self.assertIn(Config.MODEL_NAME, Config.MODELS, "MODEL_NAME should be in MODELS list")
         
-        print(f"✓ API Key configured: {Config.GEMINI_API_KEY[:10]}...")
-        print(f"✓ Models configured: {Config.MODELS}")
-        print(f"✓ Default model: {Config.MODEL_NAME}")
+        _print(f"✓ API Key configured: {Config.GEMINI_API_KEY[:10]}...")
+        _print(f"✓ Models configured: {Config.MODELS}")
+        _print(f"✓ Default model: {Config.MODEL_NAME}")
     
-    def test_2_gemini_model_response(self):
-        """Test 2: Gemini Model Response Test - Direct API test"""
-        print("\n=== Test 2: Gemini Model Response ===")
+    def test_3_database_connection(self):
+        """Test 3: Database Connection Test - Verify database setup"""
+        _print("\n=== Test 3: Database Connection ===")
         
-        # Configure Gemini with our API key
+        # Test database connection
+        try:
+            db = self.Session()
+            _print("✓ Database connection established")
+            
+            # Test that we can query both tables in a single round-trip
+            row = db.execute(text(
+                "SELECT (SELECT COUNT(*) FROM request_logs) AS r, "
+                "(SELECT COUNT(*) FROM response_logs) AS s"
+            )).one()
+            request_count, response_count = row.r, row.s
+            
+            _print(f"✓ Request logs table accessible (current count: {request_count})")
+            _print(f"✓ Response logs table accessible (current count: {response_count})")
+            
+            # Test that we can create a test record (and clean it up) using
+            # Core statements, skipping ORM unit-of-work overhead; the delete
+            # runs in the same transaction so the round-trip costs one commit
+            result = db.execute(insert(RequestLog.__table__).values(
+                endpoint="test",
+                client_ip="127.0.0.1",
+                request_body='{"test": true}'
+            ))
+            test_id = result.inserted_primary_key[0]
+            
+            self.assertIsNotNone(test_id, "Test request should have an ID")
+            _print(f"✓ Can create records (test ID: {test_id})")
+            
+            # The insert trigger should have indexed the new body
+            indexed = db.execute(FTS_MATCH, {"q": "test", "i": test_id}).scalar()
+            self.assertEqual(indexed, test_id, "New request should be in request_logs_fts")
+            _print("✓ Full-text index updated on insert")
+            
+            # Clean up test record
+            db.execute(delete(RequestLog.__table__).where(RequestLog.id == test_id))
+            
+            # The delete trigger should have removed it from the index again
+            indexed = db.execute(FTS_MATCH, {"q": "test", "i": test_id}).scalar()
+            self.assertIsNone(indexed, "Deleted request should be gone from request_logs_fts")
+            db.execute(text("INSERT INTO request_logs_fts(request_logs_fts) VALUES ('integrity-check')"))
+            _print("✓ Full-text index updated on delete")
+            
+            db.commit()
+            _print("✓ Can delete records (cleanup successful)")
+            
+        except Exception as e:
+            self.fail(f"Database connection test failed: {str(e)}")
+    
+
+@unittest.skipUnless(os.getenv("RUN_INTEGRATION") == "1", "integration tests require RUN_INTEGRATION=1")
+class TestIntegration(unittest.TestCase):
+    """Integration tests against the live Gemini API"""
+    
+    # Number of calls made by the batch endpoint test; kept small because
+    # each call hits the live Gemini API and free-tier quotas are tight
+    BATCH_SIZE = 5
+    
+    # Request payload for the /gemini/generate tests
+    GENERATE_REQUEST = {
+        "prompt": {
+            "text": "Write exactly 'API test successful' and nothing else."
+        },
+        "generation_config": {
+            "temperature": 0.1,
+            "max_output_tokens": 50
+        }
+    }
+    
+    @classmethod
+    def setUpClass(cls):
+        """Set up test environment"""
+        cls.app = app
+        cls.app.config['TESTING'] = True
+        cls.client = cls.app.test_client()
+        cls.Session = scoped_session(SessionLocal)
+        
+        # Serialize the request body once and reuse the bytes
+        cls._gen_body = msgspec.json.encode(cls.GENERATE_REQUEST)
+        
+        # Configure Gemini once and cache the model listing for all tests
         genai.configure(api_key=Config.GEMINI_API_KEY)
+        try:
+            cls._models = list(genai.list_models())
+            cls._models_error = None
+        except Exception as e:
+            cls._models = []
+            cls._models_error = e
+        
+        # Build one client per configured model so tests reuse them
+        cls._gen_models = {m: genai.GenerativeModel(m) for m in Config.MODELS}
+    
+    @classmethod
+    def tearDownClass(cls):
+        """Clean up test environment"""
+        cls.Session.remove()
+        _flush_output()
+    
+    def test_2_gemini_model_response(self):
+        """Test 2: Gemini Model Response Test - Direct API test"""
+        _print("\n=== Test 2: Gemini Model Response ===")
         
         # Test model availability
         try:
-            models = genai.list_models()
+            if self._models_error is not None:
+                raise self._models_error
+            models = self._models
             available_model_names = [model.name for model in models]
-            print(f"✓ Available models: {available_model_names}")
+            _print(f"✓ Available models: {available_model_names}")
             
             # Check if our configured models are available
             for model_name in Config.MODELS:
                 if any(model_name in available for available in available_model_names):
-                    print(f"✓ Configured model {model_name} is available")
+                    _print(f"✓ Configured model {model_name} is available")
                     break
             else:
                 self.fail("None of the configured models are available")
@@ -86,8 +229,8 @@ class TestGeminiProxyServer(unittest.TestCase):
         
         for model_name in Config.MODELS:
             try:
-                print(f"Testing model: {model_name}")
-                model = genai.GenerativeModel(model_name)
+                _print(f"Testing model: {model_name}")
+                model = self._gen_models[model_name]
                 response = model.generate_content(test_prompt)
                 
                 # Extract response text
@@ -102,180 +245,125 @@ class TestGeminiProxyServer(unittest.TestCase):
                 self.assertIsNotNone(response_text, f"Response text should not be None for {model_name}")
                 self.assertTrue(len(response_text) > 0, f"Response text should not be empty for {model_name}")
                 
-                print(f"✓ Model {model_name} response: {response_text[:50]}...")
+                _print(f"✓ Model {model_name} response: {response_text[:50]}...")
                 successful_model = model_name
                 break
                 
             except Exception as e:
-                print(f"⚠ Model {model_name} failed: {str(e)}")
+                _print(f"⚠ Model {model_name} failed: {str(e)}")
                 continue
         
         self.assertIsNotNone(successful_model, "At least one model should work")
-        print(f"✓ Successfully tested model: {successful_model}")
-    
-    def test_3_database_connection(self):
-        """Test 3: Database Connection Test - Verify database setup"""
-        print("\n=== Test 3: Database Connection ===")
-        
-        # Test database connection
-        try:
-            db = next(get_db())
-            print("✓ Database connection established")
-            
-            # Test that we can query the database
-            request_count = db.query(RequestLog).count()
-            response_count = db.query(ResponseLog).count()
-            
-            print(f"✓ Request logs table accessible (current count: {request_count})")
-            print(f"✓ Response logs table accessible (current count: {response_count})")
-            
-            # Test that we can create a test record (and clean it up)
-            test_request = RequestLog(
-                endpoint="test",
-                client_ip="127.0.0.1",
-                request_body='{"test": true}'
-            )
-            db.add(test_request)
-            db.commit()
-            db.refresh(test_request)
-            
-            self.assertIsNotNone(test_request.id, "Test request should have an ID")
-            print(f"✓ Can create records (test ID: {test_request.id})")
-            
-            # Clean up test record
-            db.delete(test_request)
-            db.commit()
-            print("✓ Can delete records (cleanup successful)")
-            
-            db.close()
-            
-        except Exception as e:
-            self.fail(f"Database connection test failed: {str(e)}")
+        _print(f"✓ Successfully tested model: {successful_model}")
     
     def test_4_gemini_generate_endpoint(self):
         """Test 4: /gemini/generate endpoint with valid requests"""
-        print("\n=== Test 4: /gemini/generate Endpoint ===")
-        
-        # Test data
-        test_request = {
-            "prompt": {
-                "text": "Write exactly 'API test successful' and nothing else."
-            },
-            "generation_config": {
-                "temperature": 0.1,
-                "max_output_tokens": 50
-            }
-        }
+        _print("\n=== Test 4: /gemini/generate Endpoint ===")
         
         # Store test data for next test (do this early)
-        self.test_prompt_text = test_request["prompt"]["text"]
+        self.test_prompt_text = self.GENERATE_REQUEST["prompt"]["text"]
         
         try:
-            # Make request to the endpoint
-            response = requests.post(
-                f"{self.server_url}/gemini/generate",
-                json=test_request,
-                headers={'Content-Type': 'application/json'},
-                timeout=30
+            # Make request to the endpoint through the in-process test client
+            response = self.client.post(
+                '/gemini/generate',
+                data=self._gen_body,
+                content_type='application/json'
             )
             
-            print(f"✓ HTTP Status: {response.status_code}")
+            _print(f"✓ HTTP Status: {response.status_code}")
             self.assertEqual(response.status_code, 200, "Should return 200 OK")
             
-            # Parse response
-            response_data = response.json()
-            self.assertIn('text', response_data, "Response should contain 'text' field")
-            self.assertIn('metrics', response_data, "Response should contain 'metrics' field")
-            self.assertIn('model', response_data, "Response should contain 'model' field")
+            # Decode straight into the expected schema; missing fields or
+            # wrong types raise msgspec.ValidationError
+            response_data = msgspec.json.decode(response.data, type=GenerateResponse)
             
-            print(f"✓ Response text: {response_data['text'][:100]}...")
-            print(f"✓ Model used: {response_data['model']}")
-            print(f"✓ Metrics: {response_data['metrics']}")
-            
-            # Validate metrics structure
-            metrics = response_data['metrics']
-            self.assertIn('prompt_tokens', metrics, "Metrics should contain prompt_tokens")
-            self.assertIn('completion_tokens', metrics, "Metrics should contain completion_tokens")
-            self.assertIn('total_tokens', metrics, "Metrics should contain total_tokens")
+            _print(f"✓ Response text: {response_data.text[:100]}...")
+            _print(f"✓ Model used: {response_data.model}")
+            _print(f"✓ Metrics: {response_data.metrics}")
             
             # Store response for next test
             self.last_response = response_data
             
-        except requests.exceptions.RequestException as e:
-            self.fail(f"Request failed: {str(e)}")
-        except json.JSONDecodeError as e:
+        except msgspec.ValidationError as e:
+            self.fail(f"Response does not match expected schema: {str(e)}")
+        except msgspec.DecodeError as e:
             self.fail(f"Failed to parse JSON response: {str(e)}")
         except Exception as e:
             self.fail(f"Endpoint test failed: {str(e)}")
     
     def test_5_database_logging_verification(self):
         """Test 5: Verify response is updated in database"""
-        print("\n=== Test 5: Database Logging Verification ===")
-        
-        # Wait a moment for database operations to complete
-        time.sleep(1)
+        _print("\n=== Test 5: Database Logging Verification ===")
         
         try:
-            db = next(get_db())
+            db = self.Session()
             
             # Get the most recent request log
-            latest_request = db.query(RequestLog).order_by(RequestLog.id.desc()).first()
+            latest_request = db.execute(LATEST_REQ).scalar_one_or_none()
             self.assertIsNotNone(latest_request, "Should have at least one request log")
             
-            print(f"✓ Latest request log ID: {latest_request.id}")
-            print(f"✓ Request endpoint: {latest_request.endpoint}")
-            print(f"✓ Request timestamp: {latest_request.timestamp}")
+            _print(f"✓ Latest request log ID: {latest_request.id}")
+            _print(f"✓ Request endpoint: {latest_request.endpoint}")
+            _print(f"✓ Request timestamp: {latest_request.timestamp}")
             
-            # Verify request contains our test data (with fallback)
-            request_body = latest_request.request_body
+            # Verify request contains our test data (with fallback); the
+            # substring check runs in SQLite so the body is never fetched
             if hasattr(self, 'test_prompt_text'):
-                self.assertIn(self.test_prompt_text, request_body, "Request body should contain our test prompt")
-                print(f"✓ Request body contains expected prompt")
+                found = db.execute(BODY_CONTAINS, {"i": latest_request.id, "p": self.test_prompt_text}).scalar()
+                self.assertTrue(found, "Request body should contain our test prompt")
+                _print(f"✓ Request body contains expected prompt")
             else:
-                print("⚠ test_prompt_text not available, skipping prompt verification")
+                _print("⚠ test_prompt_text not available, skipping prompt verification")
                 # Just verify it looks like our test request
-                self.assertIn("API test successful", request_body, "Request body should contain test prompt")
+                found = db.execute(BODY_CONTAINS, {"i": latest_request.id, "p": "API test successful"}).scalar()
+                self.assertTrue(found, "Request body should contain test prompt")
             
-            # Get the corresponding response log
-            response_log = db.query(ResponseLog).filter(
-                ResponseLog.request_id == latest_request.id
-            ).first()
+            # Get the corresponding response log. The test client commits it
+            # before post() returns, so the first query normally finds it;
+            # the short poll only covers a write that lands later
+            deadline = time.monotonic() + 1.0
+            while True:
+                response_log = db.execute(RESP_BY_REQ, {"rid": latest_request.id}).scalar_one_or_none()
+                if response_log is not None or time.monotonic() >= deadline:
+                    break
+                time.sleep(0.02)
             self.assertIsNotNone(response_log, "Should have a corresponding response log")
             
-            print(f"✓ Response log ID: {response_log.id}")
-            print(f"✓ Response timestamp: {response_log.timestamp}")
-            print(f"✓ Model used: {response_log.model_used}")
-            print(f"✓ Response time: {response_log.response_time_ms}ms")
+            _print(f"✓ Response log ID: {response_log.id}")
+            _print(f"✓ Response timestamp: {response_log.timestamp}")
+            _print(f"✓ Model used: {response_log.model_used}")
+            _print(f"✓ Response time: {response_log.response_time_ms}ms")
             
             # Verify response metrics match what was returned by API (with fallback)
             if hasattr(self, 'last_response'):
-                api_metrics = self.last_response['metrics']
+                api_metrics = self.last_response.metrics
                 
                 self.assertEqual(
                     response_log.prompt_tokens, 
-                    api_metrics['prompt_tokens'], 
+                    api_metrics.prompt_tokens, 
                     "Database prompt_tokens should match API response"
                 )
                 self.assertEqual(
                     response_log.completion_tokens, 
-                    api_metrics['completion_tokens'], 
+                    api_metrics.completion_tokens, 
                     "Database completion_tokens should match API response"
                 )
                 self.assertEqual(
                     response_log.total_tokens, 
-                    api_metrics['total_tokens'], 
+                    api_metrics.total_tokens, 
                     "Database total_tokens should match API response"
                 )
                 
-                print(f"✓ Prompt tokens: {response_log.prompt_tokens}")
-                print(f"✓ Completion tokens: {response_log.completion_tokens}")
-                print(f"✓ Total tokens: {response_log.total_tokens}")
-                print("✓ Metrics match between API response and database")
+                _print(f"✓ Prompt tokens: {response_log.prompt_tokens}")
+                _print(f"✓ Completion tokens: {response_log.completion_tokens}")
+                _print(f"✓ Total tokens: {response_log.total_tokens}")
+                _print("✓ Metrics match between API response and database")
             else:
-                print("⚠ last_response not available, checking database metrics only")
-                print(f"✓ Prompt tokens: {response_log.prompt_tokens}")
-                print(f"✓ Completion tokens: {response_log.completion_tokens}")
-                print(f"✓ Total tokens: {response_log.total_tokens}")
+                _print("⚠ last_response not available, checking database metrics only")
+                _print(f"✓ Prompt tokens: {response_log.prompt_tokens}")
+                _print(f"✓ Completion tokens: {response_log.completion_tokens}")
+                _print(f"✓ Total tokens: {response_log.total_tokens}")
                 
                 # At least verify metrics are reasonable numbers
                 self.assertGreaterEqual(response_log.prompt_tokens, 0, "Prompt tokens should be >= 0")
@@ -286,12 +374,109 @@ class TestGeminiProxyServer(unittest.TestCase):
             self.assertIsNotNone(response_log.response, "Response text should be stored")
             self.assertTrue(len(response_log.response) > 0, "Response text should not be empty")
             
-            print(f"✓ Response text stored: {response_log.response[:50]}...")
-            
-            db.close()
+            _print(f"✓ Response text stored: {response_log.response[:50]}...")
             
         except Exception as e:
             self.fail(f"Database verification failed: {str(e)}")
+    
+    # Named to sort after test_5, so test_5 still verifies test_4's request
+    def test_5b_batch_generate(self):
+        """Test 5b: Several /gemini/generate calls verified with one query"""
+        _print("\n=== Test 5b: Batch /gemini/generate ===")
+        
+        try:
+            db = self.Session()
+            
+            # Remember where the log tables were before the batch
+            before_id = db.execute(text("SELECT COALESCE(MAX(id), 0) FROM request_logs")).scalar()
+            
+            total_tokens = 0
+            for _ in range(self.BATCH_SIZE):
+                response = self.client.post(
+                    '/gemini/generate',
+                    data=self._gen_body,
+                    content_type='application/json'
+                )
+                if response.status_code == 500 and (b"429" in response.data or b"quota" in response.data.lower()):
+                    self.skipTest("Gemini quota exhausted during batch")
+                self.assertEqual(response.status_code, 200, "Should return 200 OK")
+                response_data = msgspec.json.decode(response.data, type=GenerateResponse)
+                total_tokens += response_data.metrics.total_tokens
+            
+            _print(f"✓ {self.BATCH_SIZE} requests succeeded (total tokens: {total_tokens})")
+            
+            # Verify every request got both a request and a response log
+            row = db.execute(text(
+                "SELECT COUNT(r.id) AS requests, COUNT(s.id) AS responses "
+                "FROM request_logs r LEFT JOIN response_logs s ON s.request_id = r.id "
+                "WHERE r.id > :before"
+            ), {"before": before_id}).one()
+            
+            self.assertEqual(row.requests, self.BATCH_SIZE, "Each call should log a request")
+            self.assertEqual(row.responses, self.BATCH_SIZE, "Each call should log a response")
+            _print(f"✓ {row.requests} request logs and {row.responses} response logs written")
+            
+        except unittest.SkipTest:
+            raise
+        except msgspec.ValidationError as e:
+            self.fail(f"Response does not match expected schema: {str(e)}")
+        except Exception as e:
+            self.fail(f"Batch endpoint test failed: {str(e)}")
+
+
+@unittest.skipUnless(os.getenv("RUN_INTEGRATION") == "1", "integration tests require RUN_INTEGRATION=1")
+class TestLiveServer(unittest.TestCase):
+    """Tests that need the app served over a real socket"""
+    
+    @classmethod
+    def setUpClass(cls):
+        """Start the app under waitress and open a keep-alive HTTP session"""
+        # Bind an ephemeral port up front so a bind failure raises here and a
+        # different server already listening on 5000 cannot answer the tests
+        cls.server = create_server(
+            app, host='127.0.0.1', port=0,
+            threads=4, connection_limit=64, channel_timeout=30
+        )
+        port = cls.server.effective_port
+        cls.server_url = f'http://127.0.0.1:{port}'
+        
+        # Reuse one pooled keep-alive connection for all HTTP calls to the server
+        cls.http = requests.Session()
+        cls.http.mount('http://', HTTPAdapter(pool_connections=4, pool_maxsize=16))
+        cls.http.headers.update({'Connection': 'keep-alive'})
+        
+        # Serve the app with waitress in a separate thread
+        cls.server_thread = threading.Thread(target=cls.server.run)
+        cls.server_thread.daemon = True
+        cls.server_thread.start()
+        
+        _wait_ready('127.0.0.1', port)
+        if not cls.server_thread.is_alive():
+            raise RuntimeError("waitress server thread exited during startup")
+    
+    @classmethod
+    def tearDownClass(cls):
+        """Clean up test environment"""
+        cls.http.close()
+        cls.server.close()
+        cls.server.task_dispatcher.shutdown()
+        cls.server_thread.join(timeout=5)
+        _flush_output()
+    
+    def test_6_live_server_health(self):
+        """Test 6: Repeated /health calls over one keep-alive connection"""
+        _print("\n=== Test 6: Live Server Health ===")
+        
+        try:
+            for _ in range(5):
+                response = self.http.get(f"{self.server_url}/health", timeout=5)
+                self.assertEqual(response.status_code, 200, "Should return 200 OK")
+                self.assertEqual(response.json(), {'status': 'healthy'})
+            
+            _print(f"✓ Server healthy at {self.server_url}")
+            
+        except requests.exceptions.RequestException as e:
+            self.fail(f"Request failed: {str(e)}")
 
 def run_tests():
     """Run all tests with detailed output"""
@@ -300,7 +485,10 @@ def run_tests():
     print("=" * 60)
     
     # Create test suite
-    suite = unittest.TestLoader().loadTestsFromTestCase(TestGeminiProxyServer)
+    suite = unittest.TestLoader().discover(
+        start_dir=os.path.dirname(os.path.abspath(__file__)),
+        pattern=os.path.basename(__file__)
+    )
     
     # Run tests with verbose output
     runner = unittest.TextTestRunner(verbosity=2)
@@ -313,6 +501,7 @@ def run_tests():
     print(f"Tests run: {result.testsRun}")
     print(f"Failures: {len(result.failures)}")
     print(f"Errors: {len(result.errors)}")
+    print(f"Skipped: {len(result.skipped)}")
     
     if result.failures:
         print("\nFAILURES:")
@@ -324,7 +513,14 @@ def run_tests():
         for test, traceback in result.errors:
             print(f"- {test}: {traceback}")
     
-    if result.wasSuccessful():
+    if result.skipped:
+        print("\nSKIPPED:")
+        for test, reason in result.skipped:
+            print(f"- {test}: {reason}")
+    
+    if result.wasSuccessful() and result.skipped:
+        print(f"\n✓ ALL RUN TESTS PASSED ({len(result.skipped)} skipped, set RUN_INTEGRATION=1 to run them)")
+    elif result.wasSuccessful():
         print("\n🎉 ALL TESTS PASSED! 🎉")
     else:
         print("\n❌ SOME TESTS FAILED")
@@ -332,4 +528,10 @@ def run_tests():
     return result.wasSuccessful()
 
 if __name__ == '__main__':
-    success = run_tests()
\ No newline at end of file
+    if importlib.util.find_spec('xdist') is not None:
+        # Run test classes in parallel workers; loadscope keeps each class
+        # (and its shared server) on a single worker
+        import pytest
+        success = pytest.main([__file__, '-n', 'auto', '--dist', 'loadscope']) == 0
+    else:
+        success = run_tests()
\ No newline at end of file